@@ -1,36 +1,58 @@
 # app/config.py
-import os
-from dotenv import load_dotenv
+from functools import cached_property
 
-# Load environment variables from .env file
-load_dotenv()
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+# Seconds per rate-limit period keyword (slowapi notation, e.g. "10/minute")
+_PERIOD_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class Settings(BaseSettings):
+    """Application settings and configuration
+
+    Frozen pydantic-settings model: values are read from the environment
+    (and .env) once at startup and are immutable afterwards.
+    """
+
+    model_config = SettingsConfigDict(env_file=".env", frozen=True, extra="ignore")
 
-class Settings:
-    """Application settings and configuration"""
-    
     # OpenAI Configuration
-    OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
-    OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
-    
+    OPENAI_API_KEY: str = ""
+    OPENAI_MODEL: str = "gpt-3.5-turbo"
+
     # Application Configuration
     APP_NAME: str = "LLM Inference Platform"
     APP_VERSION: str = "1.0.0"
-    ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
-    
+    ENVIRONMENT: str = "development"
+    LOG_LEVEL: str = "INFO"
+
     # Rate Limiting
     RATE_LIMIT: str = "10/minute"  # 10 requests per minute
-    
+    # Shared Redis backend so limits hold across workers/replicas;
+    # empty means slowapi's in-memory storage (single-process dev only)
+    RATE_LIMIT_REDIS_URL: str = ""
+
     # API Configuration
     MAX_TOKENS: int = 500
     TEMPERATURE: float = 0.7
-    
+
+    @cached_property
+    def RATE_LIMIT_COUNT(self) -> int:
+        """Request count parsed once from RATE_LIMIT (e.g. 10 for "10/minute")"""
+        return int(self.RATE_LIMIT.split("/", 1)[0])
+
+    @cached_property
+    def RATE_LIMIT_PERIOD_SECONDS(self) -> int:
+        """Window length in seconds parsed once from RATE_LIMIT"""
+        return _PERIOD_SECONDS[self.RATE_LIMIT.split("/", 1)[1]]
+
     def validate(self):
         """Validate critical configuration"""
         if not self.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY must be set in environment variables")
         return True
 
-# Create a global settings instance
+
+# Create a global settings instance; validation is deferred to app startup
+# so the module stays importable without a configured environment
 settings = Settings()
-settings.validate()
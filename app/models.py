@@ -1,19 +1,37 @@
 # app/models.py
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, field_validator
+from typing import Dict, Literal, Optional, List, TypedDict
 
-class ChatMessage(BaseModel):
+class ChatMessage(TypedDict):
     """A single message in a chat conversation"""
-    role: str = Field(..., description="Role: 'user', 'assistant', or 'system'")
-    content: str = Field(..., description="Message content")
+    role: Literal["user", "assistant", "system"]
+    content: str
+
+# Roles accepted in chat messages, interned once for the validator
+_VALID_ROLES = frozenset(("user", "assistant", "system"))
 
 class InferenceRequest(BaseModel):
     """Request body for inference endpoint"""
-    messages: List[ChatMessage] = Field(..., description="List of chat messages")
+    messages: List[Dict[str, str]] = Field(..., description="List of chat messages")
     max_tokens: Optional[int] = Field(500, description="Maximum tokens to generate")
     temperature: Optional[float] = Field(0.7, ge=0.0, le=2.0, description="Sampling temperature")
     stream: Optional[bool] = Field(False, description="Enable streaming response")
-    
+
+    @field_validator("messages")
+    @classmethod
+    def check_message_structure(cls, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Validate message shape without constructing per-message models
+
+        The parsed dicts are passed to the OpenAI API by reference, so no
+        further serialization happens on the request path.
+        """
+        for message in messages:
+            if message.get("role") not in _VALID_ROLES:
+                raise ValueError("role must be 'user', 'assistant', or 'system'")
+            if not isinstance(message.get("content"), str):
+                raise ValueError("content must be a string")
+        return messages
+
     model_config = {
         "json_schema_extra": {
             "examples": [
@@ -29,6 +47,22 @@ class InferenceRequest(BaseModel):
         }
     }
 
+class BatchRequest(BaseModel):
+    """Request body for batch inference endpoint"""
+    requests: List[InferenceRequest] = Field(..., description="Inference requests to submit as one batch")
+
+class BatchSubmitResponse(BaseModel):
+    """Response body for batch submission"""
+    batch_id: str = Field(..., description="OpenAI batch job ID")
+    status: str = Field(..., description="Initial batch status")
+    request_count: int = Field(..., description="Number of requests in the batch")
+
+class BatchStatusResponse(BaseModel):
+    """Status of a submitted batch job"""
+    batch_id: str = Field(..., description="OpenAI batch job ID")
+    status: str = Field(..., description="Current batch status")
+    results: Optional[List[dict]] = Field(None, description="Per-request results once the batch completes")
+
 class InferenceResponse(BaseModel):
     """Response body for inference endpoint"""
     id: str = Field(..., description="Unique response ID")